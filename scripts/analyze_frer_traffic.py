@@ -6,106 +6,493 @@ Detects duplicates, measures latency, and validates sequence numbers
 """
 
 import argparse
+import ctypes
+import gc
+import multiprocessing
+import os
+import select
+import socket
 import time
 import struct
 import sys
-from collections import defaultdict
-from typing import Dict, Set
-from scapy.all import sniff, Ether, Dot1Q, Raw
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from scapy.all import sniff, Ether
+
+try:
+    import pcap  # pypcap: libpcap capture without per-frame Scapy dissection
+except ImportError:
+    pcap = None
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Numba is optional: without it kernels run as plain Python"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+# R-TAG EtherType (IEEE 802.1CB)
+RTAG_ETHERTYPE = 0x893D
+
+# Stream IDs tracked by the batch kernel (one 8 KiB bitmap row each)
+NUM_STREAMS = 4096
+
+# Per-frame status codes written by process_batch
+STATUS_SKIPPED = 0
+STATUS_NEW = 1
+STATUS_DUPLICATE = 2
+
+# Windowed duplicate detection: two 1 MiB Bloom filters, 4 probes per key
+BLOOM_BITS = 1 << 23
+BLOOM_SHIFT = 32 - 23
+BLOOM_HASHES = 4
+
+# Per-worker totals at the start of each fanout shared memory segment; the
+# stream table follows at WORKER_STATS_OFFSET (one cache line in)
+WORKER_HEADER = np.dtype([('total_frames', 'u8'),
+                          ('out_of_range_frames', 'u8'),
+                          ('other_stream_frames', 'u8')])
+WORKER_STATS_OFFSET = 64
+
+# Longest a fanout worker drains its socket before checking stop/deadline
+WORKER_DRAIN_SECONDS = 0.1
+
+# Linux AF_PACKET socket options (linux/if_packet.h, linux/filter.h)
+SOL_PACKET = 263
+PACKET_AUXDATA = 8
+PACKET_FANOUT = 18
+PACKET_FANOUT_CBPF = 6
+PACKET_FANOUT_DATA = 22
+SO_ATTACH_FILTER = 26
+SKF_LL_OFF = -0x200000
+ETH_P_ALL = 0x0003
+TP_STATUS_VLAN_VALID = 0x10
+TP_STATUS_VLAN_TPID_VALID = 0x40
+
+# struct tpacket_auxdata: status, len, snaplen, mac, net, vlan_tci, vlan_tpid
+TPACKET_AUXDATA = struct.Struct('IIIHHHH')
+
+
+def stream_dtype(with_bitmap: bool) -> np.dtype:
+    """Record layout of the per-stream table (no bitmap in Bloom mode)"""
+    fields = [('count', 'u8'), ('unique', 'u8'), ('dups', 'u8'),
+              ('gaps', 'u8'), ('last_seq', 'i4'), ('min_seq', 'i4'),
+              ('max_seq', 'i4')]
+    if with_bitmap:
+        # Seen-sequence bitmap: 65536 bits (8 KiB), one per seq
+        fields.append(('bitmap', 'u8', (1024,)))
+    # Aligned so the bitmap words stay 8-byte aligned for the kernel
+    return np.dtype(fields, align=True)
+
+
+@njit(cache=True)
+def bloom_test_and_set(bloom, active, key):
+    """Check a (stream, seq) key against both filters, insert into active"""
+    # Multiplicative hashing (top bits of the 32-bit product), combined as
+    # h1 + k * h2 for the k-th probe
+    h1 = (key * 0x5BD1E995) & 0xFFFFFFFF
+    h2 = ((key * 0x27D4EB2F) & 0xFFFFFFFF) | 1
+
+    in_active = True
+    in_previous = True
+    for k in range(BLOOM_HASHES):
+        idx = ((h1 + k * h2) & 0xFFFFFFFF) >> BLOOM_SHIFT
+        word = idx >> 6
+        bit = np.uint64(1) << np.uint64(idx & 63)
+
+        if not bloom[active, word] & bit:
+            in_active = False
+            bloom[active, word] |= bit
+        if not bloom[1 - active, word] & bit:
+            in_previous = False
+
+    return in_active or in_previous
+
+
+@njit(cache=True)
+def process_batch(ethertype, seq_num, stream_id, stats, bitmap, bloom,
+                  bloom_active, use_bloom, status, gap_len):
+    """Update per-stream duplicate/gap statistics for a batch of frames
+
+    stats is the stream_dtype record table, indexed by stream ID. Duplicates
+    are found in the per-stream bitmap, or with use_bloom in the
+    rotating Bloom filter pair. Returns (rtag_frames, duplicates, gaps,
+    out_of_range) for the batch and fills status/gap_len with one entry
+    per input frame.
+    """
+    n_rtag = 0
+    n_dup = 0
+    n_gap = 0
+    n_out_of_range = 0
+
+    for i in range(ethertype.size):
+        status[i] = STATUS_SKIPPED
+        gap_len[i] = 0
+
+        if ethertype[i] != RTAG_ETHERTYPE:
+            continue
+
+        sid = stream_id[i]
+        if sid >= stats.shape[0]:
+            n_out_of_range += 1
+            continue
+
+        s = seq_num[i]
+        r = stats[sid]
+        n_rtag += 1
+        r['count'] += 1
+
+        if use_bloom:
+            is_dup = bloom_test_and_set(bloom, bloom_active,
+                                        (np.int64(sid) << 16) | np.int64(s))
+        else:
+            # One bit per sequence number: 1024 x 64 bits covers 16-bit space
+            word = bitmap[sid, s >> 6]
+            bit = np.uint64(1) << np.uint64(s & 63)
+            is_dup = (word & bit) != 0
+            bitmap[sid, s >> 6] = word | bit
+
+        if is_dup:
+            r['dups'] += 1
+            n_dup += 1
+            status[i] = STATUS_DUPLICATE
+        else:
+            r['unique'] += 1
+            if s < r['min_seq']:
+                r['min_seq'] = s
+            if s > r['max_seq']:
+                r['max_seq'] = s
+            status[i] = STATUS_NEW
+
+            # Sequence gap since the previous frame of this stream, counted
+            # with integer arithmetic only (1..999 is a reasonable gap)
+            diff = (s - r['last_seq'] - 1) & 0xFFFF
+            is_gap = (r['last_seq'] != -1) & (diff != 0) & (diff < 1000)
+            r['gaps'] += is_gap
+            n_gap += is_gap
+            gap_len[i] = diff * is_gap
+
+            # Only new sequences advance the stream: a late copy from the
+            # slower path must not look like a jump backwards
+            r['last_seq'] = s
+
+    return n_rtag, n_dup, n_gap, n_out_of_range
 
 
 class FRERAnalyzer:
     """Analyze FRER traffic and detect frame replication/elimination"""
 
-    RTAG_ETHERTYPE = 0x893D
-
-    def __init__(self, interface: str, stream_id: int = 1):
+    RTAG_ETHERTYPE = RTAG_ETHERTYPE
+    VLAN_TPID = 0x8100
+
+    # In-kernel BPF: only VLAN-tagged R-TAG frames are copied to user space.
+    # 'vlan' also matches tags stripped by NIC offload, which a fixed
+    # ether[16:2] offset test would miss
+    BPF_FILTER = "vlan and ether proto 0x893D"
+
+    # Bytes 12..20 as one big-endian word: TPID | TCI | R-TAG EtherType | Seq.
+    # A frame is VLAN + R-TAG iff (word & RTAG_MASK) == RTAG_MATCH. Plain
+    # ints for the per-frame path, np.uint64 copies for flush_batch
+    RTAG_MASK = 0xFFFF0000FFFF0000
+    RTAG_MATCH = (VLAN_TPID << 48) | (RTAG_ETHERTYPE << 16)
+    RTAG_MASK_U64 = np.uint64(RTAG_MASK)
+    RTAG_MATCH_U64 = np.uint64(RTAG_MATCH)
+
+    # Precompiled struct format for the same word + Stream ID
+    _rtag_unpack = struct.Struct('>QH').unpack_from
+
+    # Raw frames are decoded in batches; R-TAG ends at byte 22, so only
+    # the first SNAP_LEN bytes of each frame are kept
+    BATCH_SIZE = 1024
+    SNAP_LEN = 64
+
+    # Per-frame log lines are queued per batch; the oldest batches are
+    # dropped if the printer thread falls this far behind
+    LOG_QUEUE_LEN = 256
+
+    def __init__(self, interface: str, stream_id: int = 1,
+                 quiet: bool = False, dedup: str = 'bitmap',
+                 window_ms: int = 100, strict_stream: bool = False,
+                 stream_stats: np.ndarray = None):
         self.interface = interface
         self.stream_id = stream_id
+        self.strict_stream = strict_stream
+        self.quiet = quiet
+        self.dedup = dedup
+        self.window_ms = window_ms
 
         # Statistics
         self.total_frames = 0
         self.rtag_frames = 0
         self.duplicate_frames = 0
         self.sequence_gaps = 0
+        self.out_of_range_frames = 0
+        self.other_stream_frames = 0
+
+        # Tracking: one record per stream ID. A caller may pass the table
+        # in (e.g. backed by shared memory)
+        self.unique_frames = 0
+        self.use_bloom = dedup == 'bloom'
+        if stream_stats is None:
+            stream_stats = np.zeros(NUM_STREAMS,
+                                    dtype=stream_dtype(not self.use_bloom))
+        self.stream_stats = stream_stats
+        stream_stats['last_seq'] = -1
+        stream_stats['min_seq'] = 0xFFFF
+        stream_stats['max_seq'] = -1
+
+        # Duplicate detection state; only the selected method is allocated
+        if self.use_bloom:
+            # Two filters, swapped every window/2: an entry is remembered
+            # for between window/2 and window after it was last seen
+            self.stream_bitmap = np.zeros((0, 1024), dtype=np.uint64)
+            self.bloom = np.zeros((2, BLOOM_BITS // 64), dtype=np.uint64)
+        else:
+            self.stream_bitmap = stream_stats['bitmap']
+            self.bloom = np.zeros((2, 0), dtype=np.uint64)
+        self.bloom_active = 0
+        self._bloom_rotate_at = time.monotonic() + window_ms / 2000
 
-        # Tracking
-        self.seen_sequences: Set[int] = set()
-        self.stream_stats: Dict[int, Dict] = defaultdict(lambda: {
-            'count': 0,
-            'sequences': set(),
-            'duplicates': 0,
-            'last_seq': -1
-        })
-
-        self.start_time = time.time()
-
-    def extract_rtag(self, frame: Ether) -> tuple:
-        """Extract R-TAG from frame"""
-        try:
-            if not frame.haslayer(Dot1Q):
-                return None, None, None
-
-            # Get payload after VLAN tag
-            payload = bytes(frame[Dot1Q].payload)
+        # Decode batch for raw frames (bytearray so slice copies are memcpy)
+        self._raw = bytearray(self.BATCH_SIZE * self.SNAP_LEN)
+        self._batch = np.frombuffer(self._raw, dtype=np.uint8).reshape(
+            self.BATCH_SIZE, self.SNAP_LEN)
+        self._batch_len = 0
 
-            if len(payload) < 6:
-                return None, None, None
+        # EtherType / Seq / Stream ID rows for frames analyzed one at a time
+        self._one = np.zeros((3, 1), dtype=np.uint16)
 
-            # Check for R-TAG EtherType
-            ethertype = struct.unpack('>H', payload[0:2])[0]
+        # Frame log: filled by analyze_batch, drained by _log_worker
+        self._logq = deque(maxlen=self.LOG_QUEUE_LEN)
+        self._log_stop = threading.Event()
+        self._log_thread = None
 
-            if ethertype != self.RTAG_ETHERTYPE:
-                return None, None, None
+        # Single-stream mode: skip other stream IDs before any bookkeeping
+        if strict_stream:
+            self.analyze_frame = self._analyze_frame_single
 
-            # Extract sequence number and stream ID
-            seq_num = struct.unpack('>H', payload[2:4])[0]
-            stream_id = struct.unpack('>H', payload[4:6])[0]
+        self.start_time = time.time()
 
-            return ethertype, seq_num, stream_id
+    def extract_rtag(self, raw: memoryview) -> tuple:
+        """Extract R-TAG from raw frame bytes"""
+        # The capture filter already matched VLAN + R-TAG; only guard length
+        if len(raw) < 22:
+            return None, None, None
 
-        except Exception as e:
+        # TPID | TCI | R-TAG EtherType | Seq, then Stream ID
+        word, stream_id = self._rtag_unpack(raw, 12)
+        if (word & self.RTAG_MASK) != self.RTAG_MATCH:
             return None, None, None
 
+        return self.RTAG_ETHERTYPE, word & 0xFFFF, stream_id
+
     def analyze_frame(self, frame: Ether):
         """Analyze a single frame"""
-        self.total_frames += 1
+        self._analyze_rtag(*self._frame_rtag(frame))
 
-        # Extract R-TAG
-        ethertype, seq_num, stream_id = self.extract_rtag(frame)
+    def _analyze_frame_single(self, frame: Ether):
+        """analyze_frame specialized for --strict-stream"""
+        ethertype, seq_num, stream_id = self._frame_rtag(frame)
 
-        if ethertype is None:
-            return  # Not an R-TAG frame
+        if stream_id != self.stream_id:
+            self.total_frames += 1
+            if ethertype is not None:
+                self.other_stream_frames += 1
+            return
+
+        self._analyze_rtag(ethertype, seq_num, stream_id)
 
-        self.rtag_frames += 1
-        stats = self.stream_stats[stream_id]
-        stats['count'] += 1
+    def _frame_rtag(self, frame: Ether) -> tuple:
+        """Extract R-TAG from the captured bytes, without re-serializing"""
+        raw = frame.original or bytes(frame)
+        return self.extract_rtag(memoryview(raw))
 
-        # Check for duplicates
-        if seq_num in stats['sequences']:
-            self.duplicate_frames += 1
-            stats['duplicates'] += 1
-            status = "🔄 DUPLICATE"
+    def _analyze_rtag(self, ethertype, seq_num, stream_id):
+        """Run one decoded frame through the batch kernel"""
+        if ethertype is None:
+            self.total_frames += 1  # Not an R-TAG frame
+            return
+
+        # Reused one-frame batch; R-TAG frames are counted by analyze_batch
+        one = self._one
+        one[0, 0] = ethertype
+        one[1, 0] = seq_num
+        one[2, 0] = stream_id
+        self.analyze_batch(one[0], one[1], one[2])
+
+    def analyze_raw(self, data: bytes):
+        """Queue a raw frame (as delivered by libpcap) for batch decoding"""
+        n = min(len(data), self.SNAP_LEN)
+        if n < 22:
+            self.total_frames += 1  # Too short to carry VLAN + R-TAG
+            return
+
+        off = self._batch_len * self.SNAP_LEN
+        self._raw[off:off + n] = data[:n]
+        self._batch_len += 1
+
+        if self._batch_len == self.BATCH_SIZE:
+            self.flush_batch()
+
+    def flush_batch(self):
+        """Decode all queued raw frames in one vectorized pass"""
+        if self._batch_len == 0:
+            return
+
+        # DMAC (6) | SMAC (6) | TPID (2) | TCI (2) | R-TAG (6)
+        buf = self._batch[:self._batch_len]
+        word = buf[:, 12:20].view('>u8')[:, 0].astype(np.uint64)
+        seq_num = (word & np.uint64(0xFFFF)).astype(np.uint16)
+        stream_id = buf[:, 20:22].view('>u2')[:, 0].astype(np.uint16)
+
+        # Classify every row with one mask + compare, no per-frame branches
+        is_rtag = (word & self.RTAG_MASK_U64) == self.RTAG_MATCH_U64
+        if self.strict_stream:
+            is_target = stream_id == self.stream_id
+            self.other_stream_frames += int(np.count_nonzero(is_rtag & ~is_target))
+            is_rtag &= is_target
+        ethertype = np.where(is_rtag, self.RTAG_ETHERTYPE,
+                             0).astype(np.uint16)
+
+        self._batch_len = 0
+        self.analyze_batch(ethertype, seq_num, stream_id)
+
+    def analyze_batch(self, ethertype: np.ndarray, seq_num: np.ndarray,
+                      stream_id: np.ndarray):
+        """Analyze a batch of decoded R-TAG header fields"""
+        n = len(ethertype)
+        base = self.total_frames
+        self.total_frames += n
+
+        if self.use_bloom:
+            self._rotate_bloom()
+
+        status = np.empty(n, dtype=np.uint8)
+        gap_len = np.empty(n, dtype=np.uint16)
+        n_rtag, n_dup, n_gap, n_out_of_range = process_batch(
+            ethertype, seq_num, stream_id, self.stream_stats,
+            self.stream_bitmap, self.bloom, self.bloom_active, self.use_bloom,
+            status, gap_len)
+
+        self.rtag_frames += n_rtag
+        self.duplicate_frames += n_dup
+        self.unique_frames += n_rtag - n_dup
+        self.sequence_gaps += n_gap
+        self.out_of_range_frames += n_out_of_range
+
+        # Hand frame info to the printer thread (fancy indexing copies)
+        if not self.quiet:
+            idx = np.flatnonzero(status)
+            self._logq.append((base + idx + 1, stream_id[idx], seq_num[idx],
+                               status[idx], gap_len[idx]))
+
+    def warm_up(self):
+        """Compile the batch kernel now rather than on the first traffic"""
+        empty = np.zeros(0, dtype=np.uint16)
+        self.analyze_batch(empty, empty, empty)
+
+    def _rotate_bloom(self):
+        """Expire old Bloom filter entries once per half window"""
+        now = time.monotonic()
+        if now < self._bloom_rotate_at:
+            return
+
+        # Rotations are only applied when a batch arrives, so catch up on
+        # every half window that passed since the last one
+        half = self.window_ms / 2000
+        periods = int((now - self._bloom_rotate_at) // half) + 1
+        if periods >= 2:
+            # Idle for a full window or more: nothing is recent any more
+            self.bloom[:] = 0
         else:
-            stats['sequences'].add(seq_num)
-            status = "✅ NEW"
-
-        # Check for sequence gaps
-        if stats['last_seq'] != -1:
-            expected_seq = (stats['last_seq'] + 1) & 0xFFFF
-            if seq_num != expected_seq and seq_num not in stats['sequences']:
-                gap = (seq_num - expected_seq) & 0xFFFF
-                if gap < 1000:  # Reasonable gap
-                    self.sequence_gaps += 1
-                    status += f" ⚠️ GAP:{gap}"
-
-        stats['last_seq'] = seq_num
-
-        # Print frame info
-        print(f"Frame #{self.total_frames:6d} | "
-              f"Stream:{stream_id:4d} | "
-              f"Seq:{seq_num:6d} | "
-              f"{status}")
+            # Clear the older filter and make it the insert target
+            self.bloom_active = 1 - self.bloom_active
+            self.bloom[self.bloom_active] = 0
+        self._bloom_rotate_at += periods * half
+
+    def _log_worker(self):
+        """Print queued frame info off the capture path"""
+        while self._logq or not self._log_stop.is_set():
+            if not self._logq:
+                self._log_stop.wait(0.05)
+                continue
+
+            frame_no, stream_id, seq_num, status, gap_len = self._logq.popleft()
+
+            lines = []
+            for n, sid, seq, st, gap in zip(frame_no.tolist(), stream_id.tolist(),
+                                           seq_num.tolist(), status.tolist(),
+                                           gap_len.tolist()):
+                frame_status = "🔄 DUPLICATE" if st == STATUS_DUPLICATE else "✅ NEW"
+                if gap:
+                    frame_status += f" ⚠️ GAP:{gap}"
+
+                lines.append(f"Frame #{n:6d} | "
+                             f"Stream:{sid:4d} | "
+                             f"Seq:{seq:6d} | "
+                             f"{frame_status}")
+
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+
+    def start_logging(self):
+        """Start the frame log printer thread"""
+        if self.quiet or self._log_thread is not None:
+            return
+        self._log_stop.clear()
+        self._log_thread = threading.Thread(target=self._log_worker, daemon=True)
+        self._log_thread.start()
+
+    def stop_logging(self):
+        """Flush the frame log and stop the printer thread"""
+        if self._log_thread is None:
+            return
+        self._log_stop.set()
+        self._log_thread.join()
+        self._log_thread = None
+
+    def merge_worker_stats(self, headers, tables):
+        """Combine worker totals and stream tables into this analyzer"""
+        for header in headers:
+            self.total_frames += int(header['total_frames'][0])
+            self.out_of_range_frames += int(header['out_of_range_frames'][0])
+            self.other_stream_frames += int(header['other_stream_frames'][0])
+
+        # The fanout program sends each stream ID to exactly one worker, so
+        # every stream's row comes from a single table. Gap counts depend on
+        # that: a worker seeing only part of a stream would count the
+        # other workers' sequences as gaps
+        stats = self.stream_stats
+        for table in tables:
+            sids = np.flatnonzero(table['count'])
+            rows = table[sids]
+            stats['count'][sids] += rows['count']
+            stats['gaps'][sids] += rows['gaps']
+            stats['min_seq'][sids] = np.minimum(stats['min_seq'][sids],
+                                                rows['min_seq'])
+            stats['max_seq'][sids] = np.maximum(stats['max_seq'][sids],
+                                                rows['max_seq'])
+            if self.use_bloom:
+                stats['unique'][sids] += rows['unique']
+            else:
+                self.stream_bitmap[sids] |= rows['bitmap']
+
+        # A sequence seen by any worker is unique once; the rest are copies
+        if not self.use_bloom:
+            sids = np.flatnonzero(stats['count'])
+            bits = np.unpackbits(self.stream_bitmap[sids].view(np.uint8), axis=1)
+            stats['unique'][sids] = bits.sum(axis=1)
+        stats['dups'] = stats['count'] - stats['unique']
+
+        self.rtag_frames = int(stats['count'].sum())
+        self.unique_frames = int(stats['unique'].sum())
+        self.duplicate_frames = int(stats['dups'].sum())
+        self.sequence_gaps = int(stats['gaps'].sum())
 
     def print_statistics(self):
         """Print final statistics"""
@@ -120,27 +507,37 @@ class FRERAnalyzer:
         print(f"🏷️  R-TAG Frames: {self.rtag_frames}")
         print(f"🔄 Duplicate Frames: {self.duplicate_frames}")
         print(f"⚠️  Sequence Gaps: {self.sequence_gaps}")
+        if self.out_of_range_frames > 0:
+            print(f"🚫 Stream ID >= {NUM_STREAMS} (ignored): "
+                  f"{self.out_of_range_frames}")
+        if self.other_stream_frames > 0:
+            print(f"🚫 Other Streams (ignored): {self.other_stream_frames}")
 
         if self.rtag_frames > 0:
             dup_rate = (self.duplicate_frames / self.rtag_frames) * 100
             print(f"📈 Duplication Rate: {dup_rate:.2f}%")
 
         print("\n🌊 Per-Stream Statistics:")
-        for stream_id, stats in sorted(self.stream_stats.items()):
+        for stream_id in np.nonzero(self.stream_stats['count'])[0].tolist():
+            r = self.stream_stats[stream_id]
+            count = int(r['count'])
+            unique = int(r['unique'])
+            duplicates = int(r['dups'])
+
             print(f"\n   Stream {stream_id}:")
-            print(f"      Total Frames: {stats['count']}")
-            print(f"      Unique Sequences: {len(stats['sequences'])}")
-            print(f"      Duplicates: {stats['duplicates']}")
+            print(f"      Total Frames: {count}")
+            print(f"      Unique Sequences: {unique}")
+            print(f"      Duplicates: {duplicates}")
 
-            if stats['count'] > 0:
-                dup_pct = (stats['duplicates'] / stats['count']) * 100
+            if count > 0:
+                dup_pct = (duplicates / count) * 100
                 print(f"      Duplication Rate: {dup_pct:.2f}%")
 
-            if len(stats['sequences']) > 0:
-                min_seq = min(stats['sequences'])
-                max_seq = max(stats['sequences'])
+            if unique > 0:
+                min_seq = int(r['min_seq'])
+                max_seq = int(r['max_seq'])
                 expected = (max_seq - min_seq + 1)
-                actual = len(stats['sequences'])
+                actual = unique
                 loss_pct = ((expected - actual) / expected * 100) if expected > 0 else 0
 
                 print(f"      Sequence Range: {min_seq} - {max_seq}")
@@ -155,37 +552,285 @@ class FRERAnalyzer:
         else:
             print("\n⚠️  No duplicates detected - Check FRER configuration")
 
-        if self.sequence_gaps == 0 and len(self.seen_sequences) > 10:
+        if self.sequence_gaps == 0 and self.unique_frames > 10:
             print("✅ FRER Elimination Working: No sequence gaps")
         elif self.sequence_gaps > 0:
             print(f"⚠️  Sequence gaps detected: {self.sequence_gaps}")
 
-    def capture_traffic(self, count: int = 0, timeout: int = 60):
+    def _capture_pcap(self, count: int, timeout: int):
+        """Capture via libpcap, passing raw frame buffers to analyze_raw"""
+        p = pcap.pcap(name=self.interface, snaplen=self.SNAP_LEN,
+                      promisc=True, immediate=False, timeout_ms=100)
+        p.setfilter(self.BPF_FILTER)
+        p.setnonblock(True)
+        fd = p.fileno()
+
+        def on_frame(ts, data):
+            self.analyze_raw(data)
+
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+
+            # Sleep in the kernel until the capture buffer has frames
+            readable, _, _ = select.select([fd], [], [], min(0.1, remaining))
+            if not readable:
+                continue
+
+            # Drain whatever the kernel buffered since the last call
+            p.dispatch(count - self.total_frames if count else -1, on_frame)
+            self.flush_batch()
+            if count and self.total_frames >= count:
+                break
+
+    def _capture_fanout(self, count: int, timeout: int, workers: int):
+        """Capture with one AF_PACKET fanout worker process per CPU core"""
+        # Each worker owns one segment: totals header + stream table
+        size = WORKER_STATS_OFFSET + self.stream_stats.nbytes
+        segments = [shared_memory.SharedMemory(create=True, size=size)
+                    for _ in range(workers)]
+        try:
+            self._run_fanout_workers(segments, count, timeout)
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    def _run_fanout_workers(self, segments, count: int, timeout: int):
+        """Run the fanout workers and merge their shared memory tables"""
+        stop = multiprocessing.Event()
+        fanout_id = os.getpid() & 0xFFFF
+
+        procs = [
+            multiprocessing.Process(
+                target=_fanout_worker, daemon=True,
+                args=(shm.name, self.interface, self.stream_id,
+                      self.strict_stream, fanout_id, self.dedup,
+                      self.window_ms, timeout, stop))
+            for shm in segments
+        ]
+        for proc in procs:
+            proc.start()
+
+        headers = [np.ndarray((1,), dtype=WORKER_HEADER, buffer=shm.buf)
+                   for shm in segments]
+        tables = [np.ndarray((NUM_STREAMS,), dtype=self.stream_stats.dtype,
+                             buffer=shm.buf, offset=WORKER_STATS_OFFSET)
+                  for shm in segments]
+        try:
+            # Workers publish their totals in place; no IPC to poll them
+            while any(proc.is_alive() for proc in procs):
+                if count and sum(int(h['total_frames'][0])
+                                 for h in headers) >= count:
+                    stop.set()
+                time.sleep(0.2)
+        finally:
+            stop.set()
+            for proc in procs:
+                proc.join()
+
+            self.merge_worker_stats(headers, tables)
+            del headers, tables  # Release the buffers before close()
+
+        failed = sum(1 for proc in procs if proc.exitcode)
+        if failed:
+            raise RuntimeError(f"{failed} of {len(procs)} fanout workers "
+                               f"failed; statistics are incomplete")
+
+    def capture_traffic(self, count: int = 0, timeout: int = 60,
+                        use_pcap: bool = True, workers: int = 1):
         """Capture and analyze FRER traffic"""
+        use_pcap = use_pcap and pcap is not None
+        if workers > 1:
+            backend = f'AF_PACKET fanout ({workers} workers)'
+        else:
+            backend = 'libpcap' if use_pcap else 'scapy'
+
         print(f"\n🔍 Starting FRER Traffic Capture")
         print(f"   Interface: {self.interface}")
-        print(f"   Target Stream ID: {self.stream_id}")
+        print(f"   Target Stream ID: {self.stream_id}"
+              f"{' (strict)' if self.strict_stream else ''}")
         print(f"   Count: {'Unlimited' if count == 0 else count}")
         print(f"   Timeout: {timeout} seconds")
+        print(f"   Backend: {backend}")
+        if self.use_bloom:
+            print(f"   Duplicate Detection: Bloom filter "
+                  f"({self.window_ms} ms window)")
+        if workers > 1 and not self.quiet:
+            print(f"   Per-frame Output: off with --workers (statistics only)")
         print(f"\n{'=' * 60}\n")
 
+        self.warm_up()
+        self.start_logging()
+
         try:
-            sniff(
-                iface=self.interface,
-                prn=self.analyze_frame,
-                count=count,
-                timeout=timeout,
-                filter="vlan",  # Only capture VLAN-tagged frames
-                store=False
-            )
+            if workers > 1:
+                self._capture_fanout(count, timeout, workers)
+            elif use_pcap:
+                self._capture_pcap(count, timeout)
+            else:
+                sniff(
+                    iface=self.interface,
+                    prn=self.analyze_frame,
+                    count=count,
+                    timeout=timeout,
+                    filter=self.BPF_FILTER,
+                    store=False
+                )
         except KeyboardInterrupt:
             print("\n⚠️  Capture interrupted by user")
         except Exception as e:
             print(f"\n❌ Capture error: {e}")
 
+        self.flush_batch()
+        self.stop_logging()
+
         self.print_statistics()
 
 
+def set_cbpf(sock: socket.socket, level: int, optname: int, code: list):
+    """Install a classic BPF program given as (code, jt, jf, k) tuples"""
+    insns = b''.join(struct.pack('HBBI', *insn) for insn in code)
+    prog = ctypes.create_string_buffer(insns)
+    fprog = struct.pack('HL', len(code), ctypes.addressof(prog))
+    sock.setsockopt(level, optname, fprog)
+
+
+def open_fanout_socket(interface: str, fanout_id: int) -> socket.socket:
+    """Open an AF_PACKET socket in a fanout group split by R-TAG stream ID"""
+    # Protocol 0 receives nothing until bind() picks the interface: a socket
+    # opened with ETH_P_ALL would queue frames from every interface
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, 0)
+
+    # Classic BPF equivalent of "vlan and ether proto 0x893D": the tag is
+    # usually stripped into skb metadata, otherwise it is still in-band
+    code = [
+        (0x20, 0, 0, 0xFFFFF030),       # ld  vlan_avail
+        (0x15, 2, 0, 0),                # jeq #0, inband
+        (0x28, 0, 0, 12),               # ldh [12]
+        (0x15, 4, 5, RTAG_ETHERTYPE),   # jeq #0x893D, accept, drop
+        (0x28, 0, 0, 12),               # inband: ldh [12]
+        (0x15, 0, 3, FRERAnalyzer.VLAN_TPID),  # jeq #0x8100, next, drop
+        (0x28, 0, 0, 16),               # ldh [16]
+        (0x15, 0, 1, RTAG_ETHERTYPE),   # jeq #0x893D, accept, drop
+        (0x06, 0, 0, FRERAnalyzer.SNAP_LEN),   # accept: ret #snaplen
+        (0x06, 0, 0, 0),                # drop: ret #0
+    ]
+    set_cbpf(sock, socket.SOL_SOCKET, SO_ATTACH_FILTER, code)
+
+    sock.setsockopt(SOL_PACKET, PACKET_AUXDATA, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 << 20)
+    sock.bind((interface, ETH_P_ALL))
+
+    # The kernel flow hash has no L3/L4 tuple for R-TAG frames, so
+    # PACKET_FANOUT_HASH would send them all to one worker. Select the
+    # worker by Stream ID (modulo group size) instead: load is spread
+    # across streams and each stream stays on one worker, which keeps its
+    # per-stream sequence and gap state complete. Fanout runs before the
+    # socket rewinds received frames to the MAC header, so the loads are
+    # relative to it (SKF_LL_OFF)
+    ll_off = SKF_LL_OFF & 0xFFFFFFFF
+    sock.setsockopt(SOL_PACKET, PACKET_FANOUT,
+                    fanout_id | (PACKET_FANOUT_CBPF << 16))
+    set_cbpf(sock, SOL_PACKET, PACKET_FANOUT_DATA, [
+        (0x20, 0, 0, 0xFFFFF030),       # ld  vlan_avail
+        (0x15, 2, 0, 0),                # jeq #0, inband
+        (0x28, 0, 0, ll_off + 16),      # ldh [ll + 16] (tag stripped)
+        (0x16, 0, 0, 0),                # ret a
+        (0x28, 0, 0, ll_off + 20),      # inband: ldh [ll + 20]
+        (0x16, 0, 0, 0),                # ret a
+    ])
+
+    # Between bind() and the fanout join every member got a copy of each
+    # frame; drop those so no frame is counted by two workers
+    sock.setblocking(False)
+    try:
+        while True:
+            sock.recv(FRERAnalyzer.SNAP_LEN)
+    except BlockingIOError:
+        pass
+    sock.setblocking(True)
+    return sock
+
+
+def restore_vlan_tag(data: bytes, ancdata: list) -> bytes:
+    """Re-insert a VLAN tag the kernel moved into PACKET_AUXDATA"""
+    for level, kind, aux in ancdata:
+        if level != SOL_PACKET or kind != PACKET_AUXDATA:
+            continue
+        status, _, _, _, _, tci, tpid = TPACKET_AUXDATA.unpack_from(aux)
+        if status & TP_STATUS_VLAN_VALID:
+            if not status & TP_STATUS_VLAN_TPID_VALID:
+                tpid = FRERAnalyzer.VLAN_TPID
+            return data[:12] + struct.pack('>HH', tpid, tci) + data[12:]
+    return data
+
+
+def _fanout_worker(shm_name: str, interface: str, stream_id: int,
+                   strict_stream: bool, fanout_id: int, dedup: str,
+                   window_ms: int, timeout: int, stop):
+    """Fanout capture process: analyze its share of frames into shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header = np.ndarray((1,), dtype=WORKER_HEADER, buffer=shm.buf)
+    table = np.ndarray((NUM_STREAMS,), dtype=stream_dtype(dedup != 'bloom'),
+                       buffer=shm.buf, offset=WORKER_STATS_OFFSET)
+    analyzer = FRERAnalyzer(interface, stream_id=stream_id, quiet=True,
+                            dedup=dedup, window_ms=window_ms,
+                            strict_stream=strict_stream, stream_stats=table)
+    analyzer.warm_up()
+
+    try:
+        sock = open_fanout_socket(interface, fanout_id)
+    except OSError as e:
+        print(f"\n❌ Fanout worker cannot capture on {interface}: {e}")
+        sys.exit(1)
+    sock.settimeout(0.1)
+    aux_size = socket.CMSG_SPACE(TPACKET_AUXDATA.size)
+
+    deadline = time.monotonic() + timeout
+    try:
+        while not stop.is_set():
+            # Drain up to one batch, but for no longer than the drain budget
+            # so stop and the deadline are also seen at low frame rates
+            drain_end = min(time.monotonic() + WORKER_DRAIN_SECONDS, deadline)
+            for _ in range(FRERAnalyzer.BATCH_SIZE):
+                try:
+                    data, ancdata, _, _ = sock.recvmsg(FRERAnalyzer.SNAP_LEN,
+                                                       aux_size)
+                except socket.timeout:
+                    break
+                analyzer.analyze_raw(restore_vlan_tag(data, ancdata))
+                if time.monotonic() >= drain_end:
+                    break
+
+            analyzer.flush_batch()
+            _publish_totals(analyzer, header)
+            if time.monotonic() >= deadline:
+                break
+    except KeyboardInterrupt:
+        pass  # The parent merges whatever was published
+    finally:
+        sock.close()
+
+    analyzer.flush_batch()
+    _publish_totals(analyzer, header)
+
+    # Drop every view of the segment (analyze_frame is a bound-method
+    # cycle, hence the collect) so close() can unmap it
+    del header, table, analyzer
+    gc.collect()
+    shm.close()
+
+
+def _publish_totals(analyzer: FRERAnalyzer, header: np.ndarray):
+    """Copy a worker's scalar counters into its shared memory header"""
+    header['total_frames'] = analyzer.total_frames
+    header['out_of_range_frames'] = analyzer.out_of_range_frames
+    header['other_stream_frames'] = analyzer.other_stream_frames
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Analyze FRER traffic with R-TAG detection'
@@ -194,16 +839,34 @@ def main():
                        help='Network interface (e.g., enp15s0)')
     parser.add_argument('--stream-id', '-s', type=int, default=1,
                        help='FRER Stream ID to monitor (default: 1)')
+    parser.add_argument('--strict-stream', action='store_true',
+                       help='Only analyze the --stream-id stream, skipping '
+                            'all other R-TAG frames')
     parser.add_argument('--count', '-c', type=int, default=0,
                        help='Number of packets to capture (0=unlimited)')
     parser.add_argument('--timeout', '-t', type=int, default=60,
                        help='Capture timeout in seconds (default: 60)')
+    parser.add_argument('--no-pcap', action='store_true',
+                       help='Capture with Scapy sniff instead of libpcap')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                       help='Do not print per-frame info (statistics only)')
+    parser.add_argument('--dedup', choices=['bitmap', 'bloom'], default='bitmap',
+                       help='Duplicate detection: per-stream bitmap, or '
+                            'windowed Bloom filter (default: bitmap)')
+    parser.add_argument('--window-ms', type=int, default=100,
+                       help='Bloom filter duplicate window in ms, cf. FRER '
+                            'reset timeout (default: 100)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Capture processes sharing the interface via '
+                            'PACKET_FANOUT (default: 1)')
 
     args = parser.parse_args()
+    if args.workers > 1 and args.no_pcap:
+        parser.error('--no-pcap cannot be combined with --workers '
+                     '(fanout workers read AF_PACKET sockets directly)')
 
     # Check for root privileges
     if sys.platform.startswith('linux'):
-        import os
         if os.geteuid() != 0:
             print("❌ This script requires root privileges (use sudo)")
             sys.exit(1)
@@ -215,12 +878,18 @@ def main():
 
     analyzer = FRERAnalyzer(
         interface=args.interface,
-        stream_id=args.stream_id
+        stream_id=args.stream_id,
+        quiet=args.quiet,
+        dedup=args.dedup,
+        window_ms=args.window_ms,
+        strict_stream=args.strict_stream
     )
 
     analyzer.capture_traffic(
         count=args.count,
-        timeout=args.timeout
+        timeout=args.timeout,
+        use_pcap=not args.no_pcap,
+        workers=args.workers
     )
 
 
@@ -8,10 +8,11 @@ DMAC (6) | SMAC (6) | VLAN (4) | R-TAG (6) | EtherType (2) | Payload
 """
 
 import argparse
+import socket
 import time
 import struct
 import sys
-from scapy.all import Ether, Dot1Q, Raw, sendp, get_if_hwaddr
+from scapy.all import Ether, Dot1Q, Raw, get_if_hwaddr
 
 
 class FRERTrafficGenerator:
@@ -20,44 +21,98 @@ class FRERTrafficGenerator:
     # R-TAG EtherType
     RTAG_ETHERTYPE = 0x893D
 
+    PAYLOAD_PREFIX = b'FRER_TEST_'
+
+    # Offsets of the per-frame sequence fields in the serialized frame:
+    # DMAC (6) | SMAC (6) | VLAN (4) | R-TAG (6) | 'FRER_TEST_' | Seq (4)
+    RTAG_SEQ_OFFSET = 18
+    PAYLOAD_SEQ_OFFSET = 22 + len(PAYLOAD_PREFIX)
+
+    # Rate pacing: frames are sent in bursts, one burst per PACE_PERIOD_NS;
+    # the last SPIN_NS before each deadline is busy-waited, not slept
+    PACE_PERIOD_NS = 1_000_000
+    SPIN_NS = 200_000
+
+    # Precompiled struct formats for the per-frame hot path
+    _rtag_packer = struct.Struct('>HHH').pack
+    _seq16_pack_into = struct.Struct('>H').pack_into
+    _seq32_pack_into = struct.Struct('>I').pack_into
+
     def __init__(self, interface: str, stream_id: int = 1):
         self.interface = interface
         self.stream_id = stream_id
         self.sequence_number = 0
         self.src_mac = get_if_hwaddr(interface)
 
+        # Payload buffer reused by build_frame; only the sequence changes
+        self._payload = bytearray()
+
+        # Serialized frame reused by generate_bytes (see prepare_template)
+        self._template = bytearray()
+        self.prepare_template()
+
     def create_rtag(self, seq_num: int, stream_id: int) -> bytes:
         """Create 6-byte R-TAG"""
         # R-TAG format: EtherType (2) + Sequence (2) + Stream ID (2)
-        rtag = struct.pack('>HHH',
-                          self.RTAG_ETHERTYPE,  # EtherType 0x893D
-                          seq_num & 0xFFFF,      # Sequence number
-                          stream_id & 0xFFFF)    # Stream ID
+        rtag = self._rtag_packer(self.RTAG_ETHERTYPE,  # EtherType 0x893D
+                                 seq_num & 0xFFFF,      # Sequence number
+                                 stream_id & 0xFFFF)    # Stream ID
         return rtag
 
-    def generate_frame(self, dst_mac: str = "ff:ff:ff:ff:ff:ff",
-                      vlan_id: int = 100, payload_size: int = 100) -> Ether:
-        """Generate FRER frame with R-TAG"""
+    def build_frame(self, seq_num: int, dst_mac: str = "ff:ff:ff:ff:ff:ff",
+                    vlan_id: int = 100, payload_size: int = 100) -> Ether:
+        """Build FRER frame with R-TAG for the given sequence number"""
 
-        # Base Ethernet + VLAN
+        # Create R-TAG
+        rtag = self.create_rtag(seq_num, self.stream_id)
+
+        # Base Ethernet + VLAN; the R-TAG EtherType is the VLAN inner type
         frame = (
             Ether(src=self.src_mac, dst=dst_mac) /
-            Dot1Q(vlan=vlan_id, prio=6)  # High priority for TSN
+            Dot1Q(vlan=vlan_id, prio=6,  # High priority for TSN
+                  type=self.RTAG_ETHERTYPE)
         )
 
-        # Create R-TAG
-        rtag = self.create_rtag(self.sequence_number, self.stream_id)
+        # Payload: 'FRER_TEST_' + Seq (4) + 'X' padding
+        size = max(payload_size, len(self.PAYLOAD_PREFIX) + 4)
+        if len(self._payload) != size:
+            self._payload = bytearray(b'X' * size)
+            self._payload[:len(self.PAYLOAD_PREFIX)] = self.PAYLOAD_PREFIX
+        self._seq32_pack_into(self._payload, len(self.PAYLOAD_PREFIX),
+                              seq_num & 0xFFFFFFFF)
 
-        # Payload
-        payload = b'FRER_TEST_' + struct.pack('>I', self.sequence_number)
-        payload += b'X' * (payload_size - len(payload))
-
-        # Combine: R-TAG + Payload
-        frame = frame / Raw(load=rtag + payload)
+        # Combine: R-TAG (Sequence + Stream ID) + Payload
+        return frame / Raw(load=rtag[2:] + self._payload)
 
+    def generate_frame(self, dst_mac: str = "ff:ff:ff:ff:ff:ff",
+                      vlan_id: int = 100, payload_size: int = 100) -> Ether:
+        """Generate next FRER frame with R-TAG"""
+        frame = self.build_frame(self.sequence_number, dst_mac=dst_mac,
+                                 vlan_id=vlan_id, payload_size=payload_size)
         self.sequence_number += 1
         return frame
 
+    def prepare_template(self, dst_mac: str = "ff:ff:ff:ff:ff:ff",
+                         vlan_id: int = 100, payload_size: int = 100):
+        """Serialize the frame once; generate_bytes only patches sequences"""
+        self._template = bytearray(bytes(self.build_frame(
+            0, dst_mac=dst_mac, vlan_id=vlan_id, payload_size=payload_size)))
+
+    def generate_bytes(self) -> bytearray:
+        """Generate next FRER frame as raw bytes (template mutated in place)"""
+        self._seq16_pack_into(self._template, self.RTAG_SEQ_OFFSET,
+                              self.sequence_number & 0xFFFF)
+        self._seq32_pack_into(self._template, self.PAYLOAD_SEQ_OFFSET,
+                              self.sequence_number & 0xFFFFFFFF)
+        self.sequence_number += 1
+        return self._template
+
+    def open_socket(self) -> socket.socket:
+        """Open a raw AF_PACKET socket bound to the interface"""
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+        sock.bind((self.interface, 0))
+        return sock
+
     def send_traffic(self, count: int = 1000, rate: int = 1000,
                     dst_mac: str = "ff:ff:ff:ff:ff:ff", vlan_id: int = 100):
         """Send FRER traffic"""
@@ -71,32 +126,51 @@ class FRERTrafficGenerator:
         print(f"   VLAN ID: {vlan_id}")
         print()
 
-        interval = 1.0 / rate  # Time between packets
-        start_time = time.time()
-        sent_count = 0
+        self.prepare_template(dst_mac=dst_mac, vlan_id=vlan_id)
+        sock = self.open_socket()
+
+        # Frames per burst and time between burst deadlines
+        burst = max(1, rate * self.PACE_PERIOD_NS // 1_000_000_000)
+        interval_ns = burst * 1_000_000_000 // rate
+
+        send = sock.send
+        generate_bytes = self.generate_bytes
+        first_seq = self.sequence_number
+
+        start_ns = time.perf_counter_ns()
+        deadline = start_ns
+        next_report = start_ns + 1_000_000_000
 
         try:
-            for i in range(count):
-                frame = self.generate_frame(dst_mac=dst_mac, vlan_id=vlan_id)
-                sendp(frame, iface=self.interface, verbose=False)
-                sent_count += 1
-
-                # Progress indicator
-                if (i + 1) % 100 == 0:
-                    elapsed = time.time() - start_time
-                    actual_rate = sent_count / elapsed
+            for burst_start in range(0, count, burst):
+                # Rate limiting: sleep most of the way, spin the rest
+                now = time.perf_counter_ns()
+                if deadline - now > self.SPIN_NS:
+                    time.sleep((deadline - now - self.SPIN_NS) / 1e9)
+                while time.perf_counter_ns() < deadline:
+                    pass
+                deadline += interval_ns
+
+                for _ in range(min(burst, count - burst_start)):
+                    send(generate_bytes())
+
+                # Progress indicator (about once per second)
+                if now >= next_report:
+                    next_report += 1_000_000_000
+                    sent_count = self.sequence_number - first_seq
+                    elapsed = (now - start_ns) / 1e9
                     print(f"   Sent: {sent_count}/{count} | "
-                          f"Rate: {actual_rate:.1f} pps | "
+                          f"Rate: {sent_count / elapsed:.1f} pps | "
                           f"Seq: {self.sequence_number}")
 
-                # Rate limiting
-                time.sleep(interval)
-
         except KeyboardInterrupt:
             print("\n⚠️  Interrupted by user")
+        finally:
+            sock.close()
 
         # Statistics
-        elapsed = time.time() - start_time
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+        sent_count = self.sequence_number - first_seq
         actual_rate = sent_count / elapsed
 
         print(f"\n📊 Traffic Generation Complete")
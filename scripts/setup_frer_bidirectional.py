@@ -19,6 +19,8 @@ import struct
 import json
 import argparse
 import sys
+from functools import reduce
+from operator import xor
 from typing import Dict, List, Tuple
 
 
@@ -34,6 +36,9 @@ class LAN9662_FRER_Config:
     CMD_SET = ord('S')
     CMD_RESPONSE = ord('R')
 
+    # Upper bound on waiting for a response; reads return at the end marker
+    RESPONSE_TIMEOUT = 0.5
+
     def __init__(self, serial_port: str = '/dev/ttyACM0', baudrate: int = 115200):
         """Initialize serial connection to LAN9662"""
         try:
@@ -43,7 +48,7 @@ class LAN9662_FRER_Config:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=2.0
+                timeout=self.RESPONSE_TIMEOUT
             )
             print(f"✅ Connected to LAN9662 on {serial_port}")
             time.sleep(0.5)  # Wait for board to be ready
@@ -53,31 +58,29 @@ class LAN9662_FRER_Config:
 
     def calculate_checksum(self, data: bytes) -> int:
         """Calculate MUP1 checksum (simple XOR)"""
-        checksum = 0
-        for byte in data:
-            checksum ^= byte
-        return checksum
+        return reduce(xor, data, 0)
 
     def send_command(self, cmd_type: int, data: bytes) -> bytes:
         """Send MUP1 command and receive response"""
-        # Build frame: >TYPE[DATA]<CHECKSUM
-        frame = bytearray()
-        frame.append(self.MUP1_START)
-        frame.append(cmd_type)
-        frame.extend(data)
-        frame.append(self.MUP1_END)
+        # Build frame: >TYPE[DATA]<CHECKSUM (checksum covers TYPE + DATA)
+        body = bytes((cmd_type,)) + data
+        checksum = self.calculate_checksum(body)
+        frame = (bytes((self.MUP1_START,)) + body +
+                 bytes((self.MUP1_END, checksum)))
 
-        # Calculate checksum
-        checksum = self.calculate_checksum(frame[1:-1])
-        frame.append(checksum)
+        # Discard leftovers of a previous reply (binary data can contain the
+        # end marker, cutting that read short) so they are not read as ours
+        self.ser.reset_input_buffer()
 
         # Send command
         self.ser.write(frame)
         self.ser.flush()
 
-        # Wait for response
-        time.sleep(0.1)
-        response = self.ser.read(1024)
+        # Read up to the end marker, then the checksum byte that follows it
+        end = bytes((self.MUP1_END,))
+        response = self.ser.read_until(end, size=1024)
+        if response.endswith(end):
+            response += self.ser.read(1)
 
         return response
 
@@ -0,0 +1,67 @@
+"""Duplicate and sequence gap accounting of the FRER analyzer"""
+
+import os
+import struct
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from analyze_frer_traffic import FRERAnalyzer  # noqa: E402
+
+
+def rtag_frame(seq_num: int, stream_id: int = 1) -> bytes:
+    """DMAC | SMAC | VLAN 100 | R-TAG | payload, as sent by the generator"""
+    return (b'\xff' * 6 + b'\x02' * 6 +
+            struct.pack('>HHHHH', 0x8100, 100, 0x893D, seq_num, stream_id) +
+            b'FRER_TEST_' + b'X' * 40)
+
+
+def analyze(seqs, dedup: str) -> FRERAnalyzer:
+    analyzer = FRERAnalyzer('lo', quiet=True, dedup=dedup, window_ms=100000)
+    for seq in seqs:
+        analyzer.analyze_raw(rtag_frame(seq))
+    analyzer.flush_batch()
+    return analyzer
+
+
+@pytest.mark.parametrize('dedup', ['bitmap', 'bloom'])
+def test_lagging_path_is_not_loss(dedup):
+    # Path B trails path A by one frame: 0, 1, 0, 2, 1, 3, 2, ...
+    seqs = [0]
+    for seq in range(1, 100):
+        seqs += [seq, seq - 1]
+    seqs.append(99)
+
+    analyzer = analyze(seqs, dedup)
+
+    assert analyzer.rtag_frames == 200
+    assert analyzer.duplicate_frames == 100
+    assert analyzer.unique_frames == 100
+    assert analyzer.sequence_gaps == 0
+
+
+@pytest.mark.parametrize('dedup', ['bitmap', 'bloom'])
+def test_lost_sequence_on_both_paths_is_a_gap(dedup):
+    seqs = [s for seq in range(10) if seq != 5 for s in (seq, seq)]
+
+    analyzer = analyze(seqs, dedup)
+
+    assert analyzer.duplicate_frames == 9
+    assert analyzer.sequence_gaps == 1
+
+
+def test_bloom_forgets_sequences_after_idle_window():
+    analyzer = FRERAnalyzer('lo', quiet=True, dedup='bloom', window_ms=50)
+    analyzer.analyze_raw(rtag_frame(1))
+    analyzer.flush_batch()
+
+    # Idle for far longer than the window, e.g. a talker restarting
+    time.sleep(0.2)
+    analyzer.analyze_raw(rtag_frame(1))
+    analyzer.flush_batch()
+
+    assert analyzer.rtag_frames == 2
+    assert analyzer.duplicate_frames == 0